@@ -1,29 +1,28 @@
+from watcher.bootstrap import parse_env
 from watcher.pod_watcher import PodWatcher
+import logging
+import signal
 import sys
-import os
 
-def main():
-    # 環境を決定（環境変数 > コマンドライン引数 > デフォルト）
-    environment = os.getenv('ENVIRONMENT', 'development')  # デフォルトは'development'
-
-    if len(sys.argv) > 1:
-        environment = sys.argv[1]
+logger = logging.getLogger(__name__)
 
-    # サポートされている環境かチェック
-    supported_environments = ['development', 'staging', 'production']
-    if environment not in supported_environments:
-        print(f"Error: Unsupported environment '{environment}'")
-        print(f"Supported environments: {supported_environments}")
+def main():
+    # 環境を決定（コマンドライン引数 > 環境変数 > デフォルト）
+    try:
+        environment = parse_env()
+    except ValueError as e:
+        logger.error("Error: %s", e)
         sys.exit(1)
 
-    print(f"Starting k8s-watcher in '{environment}' environment")
+    # SIGTERM（Podの停止時など）もCtrl+Cと同様に扱い、保留中の通知を送信してから終了
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
 
-    # Pod Watcherを作成・開始
+    # Pod Watcherを作成・開始（ログ設定はPodWatcherが環境別に行う）
     try:
         watcher = PodWatcher(environment=environment)
         watcher.start_watching()
     except Exception as e:
-        print(f"Error starting watcher: {e}")
+        logger.error("Error starting watcher: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
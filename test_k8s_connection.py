@@ -1,6 +1,10 @@
-from kubernetes import client, config
+from kubernetes import client
+from watcher.k8s_client import get_core_v1
 import os
 
+# CoreV1Apiの公開メソッド（表示用に最初の10個だけ、プロセスごとに一度だけ計算）
+_V1_METHODS_PREVIEW = tuple(method for method in dir(client.CoreV1Api) if not method.startswith('_'))[:10]
+
 def test_k8s_connection():
     print("Testing Kubernetes connection...")
 
@@ -13,23 +17,20 @@ def test_k8s_connection():
             print(f"❌ Kubeconfig file not found: {kubeconfig_path}")
             return False
 
-        config.load_kube_config(config_file=kubeconfig_path)
+        # kubeconfigの読み込みとAPIクライアントの作成（キャッシュ済みなら再利用）
+        v1 = get_core_v1(kubeconfig_path)
         print("✅ Kubeconfig loaded successfully")
-
-        # APIクライアントを作成
-        v1 = client.CoreV1Api()
         print("✅ CoreV1Api client created")
 
         # 利用可能なメソッドを確認
         print("\nAvailable methods in CoreV1Api:")
-        methods = [method for method in dir(v1) if not method.startswith('_')]
-        for method in methods[:10]:  # 最初の10個だけ表示
+        for method in _V1_METHODS_PREVIEW:
             print(f"  - {method}")
         print("  ...")
 
         # 接続テスト1: バージョン情報
         try:
-            version_api = client.VersionApi()
+            version_api = client.VersionApi(v1.api_client)
             version_info = version_api.get_code()
             print(f"✅ Server version: {version_info.git_version}")
         except Exception as e:
@@ -1,6 +1,7 @@
-from kubernetes import client, config
+from watcher.k8s_client import get_core_v1, get_kube_config_contexts
 import os
 import json
+import itertools
 
 def test_k8s_mock():
     print("Testing k8s mock connection...")
@@ -14,17 +15,15 @@ def test_k8s_mock():
             print(f"❌ Kubeconfig file not found: {kubeconfig_path}")
             return False
 
-        config.load_kube_config(config_file=kubeconfig_path)
+        # kubeconfigの読み込みとAPIクライアントの作成（キャッシュ済みなら再利用）
+        v1 = get_core_v1(kubeconfig_path)
         print("✅ Kubeconfig loaded successfully")
-
-        # APIクライアントを作成
-        v1 = client.CoreV1Api()
         print("✅ CoreV1Api client created")
 
         # k8s mockサーバーの情報を表示
         try:
             # 設定情報を取得
-            contexts, active_context = config.list_kube_config_contexts(config_file=kubeconfig_path)
+            contexts, active_context = get_kube_config_contexts(kubeconfig_path)
             if active_context:
                 server_url = active_context.get('context', {}).get('cluster')
                 print(f"📡 Connecting to: {server_url}")
@@ -33,8 +32,9 @@ def test_k8s_mock():
 
         # 接続テスト1: Pod一覧（最も基本的なテスト）
         print("\n🔍 Testing Pod API...")
+        label_selector = os.getenv('POD_LABEL_SELECTOR', '')
         try:
-            pods = v1.list_pod_for_all_namespaces(limit=5)
+            pods = v1.list_pod_for_all_namespaces(limit=5, label_selector=label_selector)
             print(f"✅ Pod API works - Found {len(pods.items)} pod(s)")
 
             # Pod詳細を表示
@@ -69,7 +69,9 @@ def test_k8s_mock():
             start_time = time.time()
             event_count = 0
 
-            for event in w.stream(v1.list_pod_for_all_namespaces, timeout_seconds=5):
+            # resource_version='0'でAPIサーバーのwatchキャッシュから開始（etcdを読まない）
+            for event in w.stream(v1.list_pod_for_all_namespaces, timeout_seconds=5,
+                                  label_selector=label_selector, resource_version='0'):
                 event_count += 1
                 print(f"   Watch event {event_count}: {event['type']} - {event['object'].metadata.name}")
 
@@ -104,12 +106,15 @@ def check_kubeconfig():
     try:
         print(f"\n📄 Kubeconfig content preview:")
         with open(kubeconfig_path, 'r') as f:
-            content = f.read()
-            lines = content.split('\n')
-            for i, line in enumerate(lines[:20]):  # 最初の20行だけ表示
+            # 最初の20行（+続きがあるかの判定用に1行）だけ読み込む
+            preview = list(itertools.islice(f, 21))
+            for i, line in enumerate(preview[:20]):
+                line = line.rstrip('\n')
                 print(f"   {i+1:2d}: {line}")
-            if len(lines) > 20:
-                print(f"   ... ({len(lines) - 20} more lines)")
+            if len(preview) > 20:
+                # 残りは行数を数えるだけで保持しない
+                remaining = 1 + sum(1 for _ in f)
+                print(f"   ... ({remaining} more lines)")
     except Exception as e:
         print(f"⚠️  Could not read kubeconfig: {e}")
 
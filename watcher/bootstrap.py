@@ -0,0 +1,32 @@
+import os
+import sys
+from typing import List, Mapping, Optional
+
+# サポートされている環境
+SUPPORTED_ENVS = frozenset({'development', 'staging', 'production'})
+
+DEFAULT_ENV = 'development'
+
+def parse_env(argv: Optional[List[str]] = None, env: Optional[Mapping[str, str]] = None) -> str:
+    """
+    実行環境を決定（コマンドライン引数 > 環境変数 > デフォルト）
+
+    Args:
+        argv: コマンドライン引数（省略時はsys.argv）
+        env: 環境変数（省略時はos.environ）
+
+    Returns:
+        str: 環境名
+
+    Raises:
+        ValueError: サポートされていない環境が指定された場合
+    """
+    argv = sys.argv if argv is None else argv
+    env = os.environ if env is None else env
+
+    environment = argv[1] if len(argv) > 1 else env.get('ENVIRONMENT', DEFAULT_ENV)
+
+    if environment not in SUPPORTED_ENVS:
+        raise ValueError(f"Unsupported environment '{environment}'. Supported environments: {sorted(SUPPORTED_ENVS)}")
+
+    return environment
@@ -1,22 +1,101 @@
 import requests
 import json
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from urllib3.util.retry import Retry
+
+# 連続失敗がこの回数に達したらサーキットブレーカーを開く
+CIRCUIT_BREAKER_THRESHOLD = 5
+# サーキットブレーカーを開いておく最大秒数
+CIRCUIT_BREAKER_MAX_COOLDOWN = 60
+# ヘルスチェック結果をキャッシュする秒数
+HEALTH_CHECK_TTL = 2.0
+# エンドポイントのパス（設定で上書き可能）
+DEFAULT_ENDPOINTS = {
+    'pod_update': '/api/pods/update',
+    'pod_update_batch': '/api/pods/update_batch',
+    'health': '/health'
+}
 
 class ClusterApiClient:
-    def __init__(self, base_url: str, api_key: Optional[str] = None):
-        self.base_url = base_url.rstrip('/')
-        self.api_key = api_key
-        self.session = requests.Session()
-        self.logger = logging.getLogger(__name__)
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: int = 30, max_retries: int = 3,
+                 cert: Optional[Tuple[str, str]] = None, ca_file: Optional[str] = None,
+                 batch_size: int = 64, flush_interval: float = 0.02,
+                 pool_connections: int = 4, pool_maxsize: int = 32,
+                 endpoints: Optional[Dict[str, str]] = None,
+                 on_send_failure: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> None:
+        self.base_url: str = base_url.rstrip('/')
+        self.api_key: Optional[str] = api_key
+        self.timeout: int = timeout
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.endpoints: Dict[str, str] = {**DEFAULT_ENDPOINTS, **(endpoints or {})}
+        # バッチ送信に失敗した際に、送信できなかったPod情報を受け取るコールバック
+        self.on_send_failure: Optional[Callable[[List[Dict[str, Any]]], None]] = on_send_failure
+        self.session: requests.Session = requests.Session()
+        self.logger: logging.Logger = logging.getLogger(__name__)
+
+        # コネクションプールを共有し、イベントごとのTCP/TLSハンドシェイクを避ける
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=max_retries,
+                # 読み取りタイムアウトは再試行しない（1回の送信がtimeout×試行回数ブロックするのを防ぐ）
+                read=0,
+                backoff_factor=0.3,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(['GET', 'POST']),
+                # 再試行を使い切った場合も例外にせず、最後のステータスと本文をログに残す
+                raise_on_status=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # クライアント証明書は構築時に一度だけ設定（リクエストごとに読み込まない）
+        if cert:
+            self.session.cert = cert
+
+        # 自己署名CAの場合もverify=Falseにせず、CAバンドルで検証する
+        if ca_file:
+            self.session.verify = ca_file
+
+        # 送信ボディは自前でシリアライズするため、Content-Typeは常に設定
+        self.session.headers['Content-Type'] = 'application/json'
 
         # 認証ヘッダーの設定
         if self.api_key:
             self.session.headers.update({
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
+                'Authorization': f'Bearer {self.api_key}'
             })
 
+        # バッチ送信用の保留キュー（batch_size件到達またはflush_interval経過で送信）
+        # 同一Podの更新は最新の内容で上書きし、1回の送信にまとめる
+        self._pending: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self._pending_lock: threading.Lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        # バッチ満杯による送信をワーカーへ依頼済みか（依頼の重複を防ぐ）
+        self._flush_scheduled: bool = False
+        self._send_lock: threading.Lock = threading.Lock()
+
+        # サーキットブレーカー（連続失敗時は一定時間即座に失敗を返す）
+        self._fail_count: int = 0
+        self._open_until: float = 0.0
+        self._breaker_lock: threading.Lock = threading.Lock()
+
+        # ヘルスチェック結果のキャッシュ
+        self._hc_ts: float = 0.0
+        self._hc_val: bool = False
+
+        # バッチ満杯時の送信用ワーカー（送信は_send_lockで1つずつ行うため1スレッドで十分）
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='clusterapi')
+
     def update_pod_status(self, pod_data: Dict[str, Any]) -> bool:
         """
         clusterapiのDB更新エンドポイントを呼び出し
@@ -27,35 +106,158 @@ class ClusterApiClient:
         Returns:
             bool: 更新成功の場合True
         """
-        endpoint = f"{self.base_url}/api/pods/update"
+        endpoint = f"{self.base_url}{self.endpoints['pod_update']}"
+
+        # DEBUGが無効な場合は整形シリアライズを行わない
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Pod data: %s", json.dumps(pod_data, indent=2))
+        if self._post(endpoint, pod_data):
+            self.logger.info("Successfully updated pod data for %s", pod_data.get('name', 'unknown'))
+            return True
+        return False
+
+    def update_pod_status_batch(self, pod_data_list: List[Dict[str, Any]]) -> bool:
+        """
+        clusterapiのバッチDB更新エンドポイントを呼び出し
+
+        Args:
+            pod_data_list: Pod情報のデータのリスト
+
+        Returns:
+            bool: 更新成功の場合True
+        """
+        endpoint = f"{self.base_url}{self.endpoints['pod_update_batch']}"
 
+        if self._post(endpoint, {"events": pod_data_list}):
+            self.logger.info("Successfully updated pod data for %d pods", len(pod_data_list))
+            return True
+        return False
+
+    def enqueue_pod_status(self, pod_data: Dict[str, Any]) -> None:
+        """Pod情報をバッチ送信キューに追加（送信前の同一Podの更新は最新のもののみ送信）"""
+        key = self._pod_key(pod_data)
+        with self._pending_lock:
+            if key in self._pending:
+                self.logger.debug("Coalescing pending update for %s/%s", pod_data.get('namespace'), pod_data.get('name'))
+            self._pending[key] = pod_data
+            full = len(self._pending) >= self.batch_size
+            flush_now = full and not self._flush_scheduled
+            if flush_now:
+                self._flush_scheduled = True
+            elif not full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+        if flush_now:
+            # 呼び出し元（watchループ）をHTTP往復でブロックしない
+            self._executor.submit(self.flush)
+
+    def flush(self) -> bool:
+        """保留中のPod情報を送信"""
+        # 送信は同時に1つだけ（送信中に届いた更新は保留キューで集約され、次回送信される）
+        # 1回の送信はbatch_size件までとし、保留キューが空になるまで繰り返す
+        success = True
+        with self._send_lock:
+            while True:
+                with self._pending_lock:
+                    batch = self._take_pending()
+
+                if not batch:
+                    return success
+                success = self._send_batch(batch) and success
+
+    def close(self) -> None:
+        """保留中のPod情報を送信してセッションを閉じる"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def _take_pending(self) -> List[Dict[str, Any]]:
+        """保留キューから古い順に最大batch_size件を取り出す（_pending_lockを保持した状態で呼び出す）"""
+        keys = list(islice(self._pending, self.batch_size))
+        batch = [self._pending.pop(key) for key in keys]
+        # 以降に満杯になった場合は改めて送信を依頼する
+        self._flush_scheduled = False
+        if not self._pending and self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        return batch
+
+    def _pod_key(self, pod_data: Dict[str, Any]) -> Tuple[Any, ...]:
+        """保留キューでの集約キー（同名で再作成されたPodを区別するためUIDを含める）"""
+        return (pod_data.get('namespace'), pod_data.get('name'), pod_data.get('uid'))
+
+    def _send_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        """バッチを送信（1件のみの場合は単発エンドポイントを使用）"""
+        if len(batch) == 1:
+            success = self.update_pod_status(batch[0])
+        else:
+            success = self.update_pod_status_batch(batch)
+
+        if not success and self.on_send_failure:
+            self.on_send_failure(batch)
+        return success
+
+    def _post(self, endpoint: str, payload: Dict[str, Any]) -> bool:
+        """clusterapiへPOSTし、成功の場合Trueを返す"""
+        if time.monotonic() < self._open_until:
+            self.logger.warning("Circuit breaker open, skipping request to %s", endpoint)
+            return False
+
+        success = self._do_post(endpoint, payload)
+        self._record_result(success)
+        return success
+
+    def _record_result(self, success: bool) -> None:
+        """サーキットブレーカーの状態を更新"""
+        with self._breaker_lock:
+            if success:
+                self._fail_count = 0
+                return
+
+            self._fail_count += 1
+            if self._fail_count >= CIRCUIT_BREAKER_THRESHOLD:
+                cooldown = min(CIRCUIT_BREAKER_MAX_COOLDOWN, 2 ** self._fail_count)
+                self._open_until = time.monotonic() + cooldown
+                self.logger.warning("Circuit breaker opened for %ss after %d consecutive failures", cooldown, self._fail_count)
+
+    def _do_post(self, endpoint: str, payload: Dict[str, Any]) -> bool:
+        """clusterapiへのPOSTを実行"""
         try:
-            self.logger.info(f"Calling clusterapi: {endpoint}")
-            self.logger.debug(f"Pod data: {json.dumps(pod_data, indent=2)}")
+            self.logger.info("Calling clusterapi: %s", endpoint)
 
-            response = self.session.post(endpoint, json=pod_data)
+            # 区切り文字の空白を省いた一度きりのシリアライズ
+            body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            response = self.session.post(endpoint, data=body, timeout=self.timeout)
 
             if response.status_code == 200:
-                self.logger.info(f"Successfully updated pod data for {pod_data.get('name', 'unknown')}")
                 return True
             else:
-                self.logger.error(f"Failed to update pod data. Status: {response.status_code}, Response: {response.text}")
+                self.logger.error("Failed to update pod data. Status: %s, Response: %s", response.status_code, response.text)
                 return False
 
-        except requests.exceptions.ConnectionError:
-            self.logger.error(f"Connection error: Unable to connect to clusterapi at {endpoint}")
+        except requests.exceptions.ConnectionError as e:
+            # 再試行を使い切った読み取りタイムアウトもConnectionErrorとして届くため、原因も出力
+            self.logger.error("Connection error: Unable to connect to clusterapi at %s: %s", endpoint, e)
             return False
         except requests.exceptions.Timeout:
-            self.logger.error(f"Timeout error: Request to {endpoint} timed out")
+            self.logger.error("Timeout error: Request to %s timed out", endpoint)
             return False
         except Exception as e:
-            self.logger.error(f"Unexpected error calling clusterapi: {e}")
+            self.logger.error("Unexpected error calling clusterapi: %s", e)
             return False
 
     def health_check(self) -> bool:
-        """clusterapiの疎通確認"""
+        """clusterapiの疎通確認（結果はHEALTH_CHECK_TTL秒間キャッシュ）"""
+        now = time.monotonic()
+        if now - self._hc_ts < HEALTH_CHECK_TTL:
+            return self._hc_val
+
         try:
-            response = self.session.get(f"{self.base_url}/health", timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+            response = self.session.get(f"{self.base_url}{self.endpoints['health']}", timeout=5)
+            self._hc_val = response.status_code == 200
+        except (requests.RequestException, OSError):
+            self._hc_val = False
+        self._hc_ts = now
+        return self._hc_val
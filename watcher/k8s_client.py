@@ -0,0 +1,33 @@
+from kubernetes import client, config
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# 共有クライアントのコネクションプールサイズ（watchと通常のAPI呼び出しを同時に行っても枯渇しないように）
+CONNECTION_POOL_MAXSIZE = 20
+
+@lru_cache(maxsize=4)
+def get_core_v1(kubeconfig_path: Optional[str] = None, in_cluster: bool = False) -> client.CoreV1Api:
+    """
+    CoreV1Apiクライアントを作成（設定ごとにキャッシュし、接続プールと認証情報を共有）
+
+    Args:
+        kubeconfig_path: kubeconfigファイルのパス（省略時はデフォルトのkubeconfig）
+        in_cluster: クラスタ内の設定（ServiceAccount）を使用する場合True
+
+    Returns:
+        client.CoreV1Api: APIクライアント
+    """
+    # グローバルのデフォルト設定を書き換えず、専用のConfigurationを作成
+    configuration = client.Configuration()
+    if in_cluster:
+        config.load_incluster_config(client_configuration=configuration)
+    else:
+        config.load_kube_config(config_file=kubeconfig_path, client_configuration=configuration)
+    configuration.connection_pool_maxsize = CONNECTION_POOL_MAXSIZE
+
+    return client.CoreV1Api(api_client=client.ApiClient(configuration=configuration))
+
+@lru_cache(maxsize=4)
+def get_kube_config_contexts(kubeconfig_path: str) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """kubeconfigのコンテキスト一覧とアクティブなコンテキストを取得（パスごとにキャッシュ）"""
+    return config.list_kube_config_contexts(config_file=kubeconfig_path)
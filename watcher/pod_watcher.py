@@ -1,78 +1,236 @@
-from kubernetes import client, config, watch
+from kubernetes import client, watch
+from kubernetes.client.rest import ApiException
 from kubernetes.config import ConfigException
+from urllib3.exceptions import HTTPError
 import yaml
+import atexit
+import json
+import hashlib
 import logging
 import os
+import queue
+import re
+import sys
+import copy
+import threading
+import random
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, List, Optional, Tuple
 from .clusterapi_client import ClusterApiClient
+from .k8s_client import get_core_v1
+
+# LibYAMLのCバインディングが利用可能ならそちらでパース
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# "${VAR}" / "${VAR:-default}" 形式の参照（文字列中の埋め込みも対象）
+_ENV_VAR_PATTERN = re.compile(r'\$\{([^:}]+)(?::-([^}]*))?\}')
+
+
+def _replace_env_var(match: re.Match) -> str:
+    """環境変数の参照を値（未設定の場合はデフォルト値）に置換"""
+    return os.getenv(match.group(1), match.group(2) or "")
+
+# 本番環境（critical_events_only）で処理するイベント種別とphase
+_CRITICAL_EVENT_TYPES = frozenset({'DELETED'})
+_CRITICAL_PHASES = frozenset({'Failed', 'Succeeded'})
+
+# パース済み設定ファイルのキャッシュ（パス -> (mtime_ns, size, 内容)）
+_YAML_CACHE: "OrderedDict[str, Tuple[int, int, Dict[str, Any]]]" = OrderedDict()
+_YAML_CACHE_MAXSIZE = 100
+
+class JsonFormatter(logging.Formatter):
+    """ログレコードを1行のJSONとして出力するフォーマッタ"""
+
+    def __init__(self, environment: str):
+        super().__init__()
+        self.environment = environment
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "environment": self.environment
+        }
+        if record.exc_info:
+            log_entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log_entry, ensure_ascii=False)
+
+class _ExcInfoQueueHandler(QueueHandler):
+    """例外情報を保持したままキューに渡すQueueHandler（JsonFormatterが"exception"として出力するため）"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 標準のprepareはトレースバックをメッセージに埋め込んでexc_infoを消すため、引数の展開のみ行う
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
 class PodWatcher:
     def __init__(self, environment: str = "development"):
         self.environment = environment
+        # 設定読み込み中もログを出力できるよう、ロガーは最初に取得（ハンドラは_setup_loggingで設定）
+        self.logger = logging.getLogger(__name__)
         self.config = self._load_environment_config()
-        # self.clusterapi_client = self._setup_clusterapi_client()
         self.v1 = None
         self.watch = watch.Watch()
+        # stop()で設定され、watchループと再接続待ちを終了させる
+        self._stop_event = threading.Event()
+        # 監視対象のnamespace（空の場合は全namespace）
+        self.target_namespaces = frozenset(self.config.get('watcher', {}).get('namespaces') or ())
+        # Pod UIDごとの最後に処理したphase（phaseが変化したイベントのみ処理するため）
+        self.phase_change_only = self.config.get('watcher', {}).get('phase_change_only', False)
+        self.pod_phase_history: "OrderedDict[str, str]" = OrderedDict()
+        self.max_phase_history = self.config.get('watcher', {}).get('max_phase_history', 100000)
+        # 履歴は通知送信スレッドからも更新されるためロックで保護
+        self._history_lock = threading.Lock()
         self._setup_logging()
+        # clusterapiへの通知は設定で有効化されている場合のみ
+        self.clusterapi_client: Optional[ClusterApiClient] = None
+        if self.config.get('clusterapi', {}).get('enabled', False):
+            self.clusterapi_client = self._setup_clusterapi_client()
 
     def _load_environment_config(self) -> Dict[str, Any]:
         """環境別設定ファイルを読み込み"""
-        # ベース設定を読み込み
-        base_config = self._load_config_file("config/base.yaml")
-
-        # 環境別設定を読み込み
+        base_config_file = "config/base.yaml"
         env_config_file = f"config/{self.environment}.yaml"
-        env_config = self._load_config_file(env_config_file)
 
-        # 設定をマージ（環境別設定が優先）
-        merged_config = self._merge_configs(base_config, env_config)
+        # マージ済み設定のJSONキャッシュが有効ならYAMLのパースを省略
+        cache_file = self._get_config_cache_path([base_config_file, env_config_file])
+        merged_config = self._read_config_cache(cache_file)
+
+        if merged_config is None:
+            # ベース設定を読み込み
+            base_config = self._load_config_file(base_config_file)
+
+            # 環境別設定を読み込み
+            env_config = self._load_config_file(env_config_file)
+
+            # 設定をマージ（環境別設定が優先）
+            merged_config = self._merge_configs(base_config or {}, env_config or {})
+
+            # 環境変数（APIキー等）を含めないよう、置換前の設定をキャッシュ
+            # 読み込みに失敗したファイルがある場合は、次回も読み込み直してエラーを出力するようキャッシュしない
+            if base_config is not None and env_config is not None:
+                self._write_config_cache(cache_file, merged_config)
 
         # 環境変数を置換
         return self._substitute_env_vars(merged_config)
 
-    def _load_config_file(self, config_file: str) -> Dict[str, Any]:
-        """設定ファイルを読み込み"""
+    def _get_config_cache_path(self, config_files: List[str]) -> str:
+        """設定ファイルの内容のハッシュからキャッシュファイルのパスを決定"""
+        digest = hashlib.sha256()
+        for config_file in config_files:
+            try:
+                with open(config_file, 'rb') as file:
+                    digest.update(file.read())
+            except OSError:
+                pass
+            # ファイルの区切り（内容の連結で別の組み合わせと衝突しないように）
+            digest.update(b'\0')
+
+        cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(cache_home, 'k8s-watcher', f"config-{self.environment}-{digest.hexdigest()}.json")
+
+    def _read_config_cache(self, cache_file: str) -> Optional[Dict[str, Any]]:
+        """マージ済み設定のキャッシュを読み込み（存在しない場合はNone）"""
+        try:
+            with open(cache_file, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_config_cache(self, cache_file: str, data: Dict[str, Any]):
+        """マージ済み設定をキャッシュに書き込み（書き込めない環境では何もしない）"""
+        cache_dir = os.path.dirname(cache_file)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
         try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(tmp_file, 'w') as file:
+                json.dump(data, file)
+            os.replace(tmp_file, cache_file)
+
+            # 同じ環境の古いキャッシュを削除
+            prefix = f"config-{self.environment}-"
+            for name in os.listdir(cache_dir):
+                path = os.path.join(cache_dir, name)
+                if name.startswith(prefix) and name.endswith('.json') and path != cache_file:
+                    os.remove(path)
+        except (OSError, TypeError, ValueError):
+            # 書き込み不可のホームディレクトリ等ではキャッシュしない
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+
+    def _load_config_file(self, config_file: str) -> Optional[Dict[str, Any]]:
+        """設定ファイルを読み込み（存在しない・読み込めない場合はNone）"""
+        try:
+            # mtimeとサイズが変わっていなければキャッシュを返す（呼び出し側で変更されても良いようにコピー）
+            stat = os.stat(config_file)
+            cached = _YAML_CACHE.get(config_file)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                _YAML_CACHE.move_to_end(config_file)
+                return copy.deepcopy(cached[2])
+
             with open(config_file, 'r') as file:
-                return yaml.safe_load(file) or {}
+                data = yaml.load(file, Loader=_SafeLoader) or {}
+
+            _YAML_CACHE[config_file] = (stat.st_mtime_ns, stat.st_size, data)
+            _YAML_CACHE.move_to_end(config_file)
+            while len(_YAML_CACHE) > _YAML_CACHE_MAXSIZE:
+                _YAML_CACHE.popitem(last=False)
+            return copy.deepcopy(data)
         except FileNotFoundError:
-            self.logger.warning(f"Config file {config_file} not found") if hasattr(self, 'logger') else print(f"Config file {config_file} not found")
-            return {}
+            self.logger.warning("Config file %s not found", config_file)
+            return None
         except Exception as e:
-            error_msg = f"Error loading config {config_file}: {e}"
-            self.logger.error(error_msg) if hasattr(self, 'logger') else print(error_msg)
-            return {}
+            self.logger.error("Error loading config %s: %s", config_file, e)
+            return None
 
     def _merge_configs(self, base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
-        """設定をマージ（再帰的）"""
-        result = base.copy()
-
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_configs(result[key], value)
-            else:
-                result[key] = value
+        """設定をマージ（ネストしたdictも再帰的にマージ）"""
+        # 片方が空（例: 環境別設定ファイルが空）の場合は走査せずにコピーのみ
+        if not override:
+            return copy.deepcopy(base)
+        if not base:
+            return copy.deepcopy(override)
+
+        result = copy.deepcopy(base)
+
+        # 再帰呼び出しと階層ごとのコピーを避け、スタックでresultを直接更新
+        stack = [(result, override)]
+        while stack:
+            dst, src = stack.pop()
+            for key, value in src.items():
+                if isinstance(value, dict) and isinstance(dst.get(key), dict):
+                    stack.append((dst[key], value))
+                else:
+                    dst[key] = value
 
         return result
 
     def _substitute_env_vars(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        """環境変数を置換"""
-        def substitute_recursive(obj):
-            if isinstance(obj, dict):
-                return {k: substitute_recursive(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [substitute_recursive(item) for item in obj]
-            elif isinstance(obj, str) and obj.startswith('${') and obj.endswith('}'):
-                env_var = obj[2:-1]
-                default_value = ""
-                if ":-" in env_var:
-                    env_var, default_value = env_var.split(":-", 1)
-                return os.getenv(env_var, default_value)
-            else:
-                return obj
-
-        return substitute_recursive(config)
+        """環境変数を置換（configを直接更新）"""
+        # 再帰で新しいdict/listを作り直さず、キューで走査して該当する値だけ置き換える
+        pending = deque([config])
+        while pending:
+            node = pending.popleft()
+            items = node.items() if isinstance(node, dict) else enumerate(node)
+            for key, value in items:
+                if isinstance(value, (dict, list)):
+                    pending.append(value)
+                elif isinstance(value, str) and '${' in value:
+                    node[key] = _ENV_VAR_PATTERN.sub(_replace_env_var, value)
+
+        return config
 
     def _setup_logging(self):
         """ログ設定"""
@@ -80,18 +238,29 @@ class PodWatcher:
 
         # 環境別のログフォーマット
         if self.environment == 'production':
-            # 本番環境：構造化ログ
-            log_format = '{"timestamp":"%(asctime)s","level":"%(levelname)s","logger":"%(name)s","message":"%(message)s","environment":"' + self.environment + '"}'
+            # 本番環境：構造化ログ（メッセージ中の"や改行もエスケープされる）
+            formatter = JsonFormatter(self.environment)
         else:
             # 開発環境：読みやすいフォーマット
-            log_format = f'[{self.environment.upper()}] %(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            formatter = logging.Formatter(f'[{self.environment.upper()}] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+        handler = logging.StreamHandler()
+        handler.setFormatter(formatter)
 
+        # 出力はQueueListenerのスレッドで行い、watchループや通知送信スレッドが書き込みでブロックしないようにする
+        log_queue = queue.SimpleQueue()
+        queue_handler = _ExcInfoQueueHandler(log_queue)
         logging.basicConfig(
             level=log_level,
-            format=log_format
+            handlers=[queue_handler]
         )
-        self.logger = logging.getLogger(__name__)
-        self.logger.info(f"Starting k8s-watcher in {self.environment} environment")
+        # 既にログ設定済みの場合（basicConfigが何もしなかった場合）はリスナーを起動しない
+        if queue_handler in logging.getLogger().handlers:
+            listener = QueueListener(log_queue, handler)
+            listener.start()
+            # 終了時にキューに残ったログを出力
+            atexit.register(listener.stop)
+        self.logger.info("Starting k8s-watcher in %s environment", self.environment)
 
     def _setup_clusterapi_client(self) -> ClusterApiClient:
         """ClusterAPI クライアントのセットアップ"""
@@ -99,13 +268,34 @@ class PodWatcher:
         base_url = clusterapi_config.get('base_url', 'http://localhost:3000')
         api_key = clusterapi_config.get('auth', {}).get('api_key')
         timeout = clusterapi_config.get('timeout', 30)
-        self.logger.info(f"Setting up ClusterAPI client: {base_url}")
+        # max_attemptsは初回を含む試行回数のため、再試行回数は1回少ない
+        max_retries = max(clusterapi_config.get('retry', {}).get('max_attempts', 3) - 1, 0)
+        tls_config = clusterapi_config.get('tls', {})
+        cert = None
+        if tls_config.get('cert_file') and tls_config.get('key_file'):
+            cert = (tls_config['cert_file'], tls_config['key_file'])
+        ca_file = tls_config.get('ca_file') or None
+        pool_config = clusterapi_config.get('pool', {})
+        batch_config = clusterapi_config.get('batch', {})
+        self.logger.info("Setting up ClusterAPI client: %s", base_url)
         if api_key:
             self.logger.debug("API key provided for authentication")
         else:
             self.logger.debug("No API key provided")
-
-        return ClusterApiClient(base_url, api_key, timeout)
+        if cert:
+            self.logger.debug("Using client certificate: %s", cert[0])
+        if ca_file:
+            self.logger.debug("Using CA bundle: %s", ca_file)
+
+        return ClusterApiClient(
+            base_url, api_key, timeout, max_retries, cert, ca_file,
+            batch_size=batch_config.get('max_batch_size', 64),
+            flush_interval=batch_config.get('flush_interval_ms', 20) / 1000,
+            pool_connections=pool_config.get('connections', 4),
+            pool_maxsize=pool_config.get('maxsize', 32),
+            endpoints=clusterapi_config.get('endpoints'),
+            on_send_failure=self._forget_phase_history
+        )
 
     def setup_k8s_client(self) -> bool:
         """Kubernetesクライアントのセットアップ（環境別）"""
@@ -115,130 +305,286 @@ class PodWatcher:
             if k8s_config.get('use_incluster_config', False):
                 # クラスタ内で実行（ステージング・本番）
                 self.logger.info("Using in-cluster configuration")
-                config.load_incluster_config()
+                self.v1 = get_core_v1(in_cluster=True)
 
             elif 'config_file' in k8s_config:
                 # kubeconfigファイルを使用（ローカル・外部アクセス）
                 kubeconfig_path = k8s_config['config_file']
-                self.logger.info(f"Loading kubeconfig from: {kubeconfig_path}")
+                self.logger.info("Loading kubeconfig from: %s", kubeconfig_path)
 
                 if not os.path.exists(kubeconfig_path):
-                    self.logger.error(f"Kubeconfig file not found: {kubeconfig_path}")
+                    self.logger.error("Kubeconfig file not found: %s", kubeconfig_path)
                     return False
 
-                config.load_kube_config(config_file=kubeconfig_path)
+                self.v1 = get_core_v1(kubeconfig_path)
 
             else:
                 # デフォルトのkubeconfig
                 self.logger.info("Using default kubeconfig")
-                config.load_kube_config()
-
-            # APIクライアントを作成
-            self.v1 = client.CoreV1Api()
-
-            # 接続テスト
-            api_version = self.v1.get_api_version()
-            self.logger.info(f"Successfully connected to Kubernetes API version: {api_version}")
-
-            # 環境別の追加チェック
-            if self.environment != 'local':
-                # 実際のK8s環境での追加チェック
-                namespaces = self.v1.list_namespace()
-                namespace_names = [ns.metadata.name for ns in namespaces.items[:5]]  # 最初の5個だけログ出力
-                self.logger.info(f"Sample namespaces: {namespace_names}")
+                self.v1 = get_core_v1()
+
+            # 接続テストと追加チェックはどちらもAPIサーバーへの往復のみのため並行して実行
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # CoreV1Apiにはバージョン取得APIがないため、同じApiClientでVersionApiを使用
+                version_future = executor.submit(client.VersionApi(self.v1.api_client).get_code)
+                namespaces_future = None
+                if self.environment != 'local':
+                    # 実際のK8s環境での追加チェック（最初の5個だけログ出力）
+                    namespaces_future = executor.submit(self.v1.list_namespace, limit=5)
+
+                # 接続テスト
+                version_info = version_future.result()
+                self.logger.info("Successfully connected to Kubernetes API version: %s", version_info.git_version)
+
+                # 追加チェックは情報出力のみのため、失敗してもセットアップは継続
+                if namespaces_future is not None:
+                    try:
+                        namespaces = namespaces_future.result()
+                        namespace_names = [ns.metadata.name for ns in namespaces.items]
+                        self.logger.info("Sample namespaces: %s", namespace_names)
+                    except ApiException as e:
+                        self.logger.warning("Could not list namespaces: %s %s", e.status, e.reason)
 
             return True
 
         except ConfigException as e:
-            self.logger.error(f"Kubernetes config error: {e}")
+            self.logger.error("Kubernetes config error: %s", e)
             return False
         except Exception as e:
-            self.logger.error(f"Error setting up k8s client: {e}")
+            self.logger.error("Error setting up k8s client: %s", e)
             return False
 
     def _extract_pod_data(self, pod) -> Dict[str, Any]:
         """Podオブジェクトからclusterapiに送信するデータを抽出"""
+        meta = pod.metadata
+        status = pod.status
+        spec = pod.spec
+
         base_data = {
-            "name": pod.metadata.name,
-            "namespace": pod.metadata.namespace,
-            "uid": pod.metadata.uid,
+            "name": meta.name,
+            "namespace": meta.namespace,
+            "uid": meta.uid,
             "environment": self.environment,  # 環境情報を追加
             "status": {
-                "phase": pod.status.phase if pod.status else "Unknown",
+                "phase": status.phase if status else "Unknown",
                 "conditions": [
                     {
                         "type": condition.type,
                         "status": condition.status,
                         "reason": condition.reason,
                         "message": condition.message
-                    } for condition in (pod.status.conditions or [])
-                ] if pod.status else [],
+                    } for condition in ((status.conditions if status else None) or ())
+                ],
                 "container_statuses": [
                     {
                         "name": cs.name,
                         "ready": cs.ready,
                         "restart_count": cs.restart_count,
-                        "state": str(cs.state) if cs.state else None
-                    } for cs in (pod.status.container_statuses or [])
-                ] if pod.status else []
+                        "state": self._summarize_container_state(cs.state)
+                    } for cs in ((status.container_statuses if status else None) or ())
+                ]
             },
             "spec": {
-                "node_name": pod.spec.node_name if pod.spec else None,
+                "node_name": spec.node_name if spec else None,
                 "containers": [
                     {
                         "name": container.name,
                         "image": container.image
-                    } for container in (pod.spec.containers or [])
-                ] if pod.spec else []
+                    } for container in ((spec.containers if spec else None) or ())
+                ]
             },
             "metadata": {
-                "labels": pod.metadata.labels or {},
-                "annotations": pod.metadata.annotations or {},
-                "creation_timestamp": pod.metadata.creation_timestamp.isoformat() if pod.metadata.creation_timestamp else None
+                "labels": meta.labels or {},
+                "annotations": meta.annotations or {},
+                "creation_timestamp": meta.creation_timestamp.isoformat() if meta.creation_timestamp else None
             },
             "event_timestamp": datetime.now().isoformat()
         }
 
         return base_data
 
+    def _summarize_container_state(self, state) -> Optional[Dict[str, Any]]:
+        """コンテナ状態を必要な項目のみのdictに変換（例: {"state": "terminated", "reason": "Error", "exit_code": 1, ...}）"""
+        if not state:
+            return None
+        # V1ContainerStateのstr()はモデル全体をpprintするため使用しない
+        for name in ('running', 'waiting', 'terminated'):
+            detail = getattr(state, name)
+            if detail is not None:
+                return {
+                    "state": name,
+                    "reason": getattr(detail, 'reason', None),
+                    "exit_code": getattr(detail, 'exit_code', None),
+                    "message": getattr(detail, 'message', None)
+                }
+        return None
+
     def should_process_event(self, event_type: str, pod) -> bool:
         """イベントを処理すべきかどうかを判定"""
         # 本番環境では重要なイベントのみ処理
         if self.environment == 'production':
             critical_only = self.config.get('watcher', {}).get('alerts', {}).get('critical_events_only', False)
-            if critical_only and event_type not in ['DELETED'] and pod.status and pod.status.phase not in ['Failed', 'Succeeded']:
+            if critical_only and event_type not in _CRITICAL_EVENT_TYPES and pod.status and pod.status.phase not in _CRITICAL_PHASES:
                 return False
 
         return True
 
+    def _should_notify_phase_change(self, event_type: str, pod_uid: str, current_phase: str) -> bool:
+        """phaseが変化したイベントかどうかを判定（DELETEDは常に対象）"""
+        if not self.phase_change_only or event_type == 'DELETED':
+            return True
+        # phase不変のイベントでも参照されたPodは最近使用扱いとし、上限超過時の削除対象から外す
+        with self._history_lock:
+            last_phase = self.pod_phase_history.get(pod_uid)
+            if last_phase is not None:
+                self.pod_phase_history.move_to_end(pod_uid)
+        return last_phase != current_phase
+
+    def _update_phase_history(self, event_type: str, pod_uid: str, current_phase: str):
+        """処理したphaseを記録（削除されたPodは履歴から除外）"""
+        if not self.phase_change_only:
+            return
+        with self._history_lock:
+            if event_type == 'DELETED':
+                self.pod_phase_history.pop(pod_uid, None)
+            else:
+                # phaseは数種類しかないため、Podごとに別の文字列を保持しないようinternする
+                self.pod_phase_history[pod_uid] = sys.intern(current_phase)
+                # 上限を超えた場合は最も長く更新されていないPodから削除
+                self.pod_phase_history.move_to_end(pod_uid)
+                while len(self.pod_phase_history) > self.max_phase_history:
+                    self.pod_phase_history.popitem(last=False)
+
+    def _forget_phase_history(self, pod_data_list: List[Dict[str, Any]]):
+        """clusterapiへの通知に失敗したPodの履歴を削除（次のイベントで再通知されるように）"""
+        with self._history_lock:
+            for pod_data in pod_data_list:
+                self.pod_phase_history.pop(pod_data.get('uid'), None)
+        self.logger.warning("Notification failed for %d pods; they will be re-sent on their next event", len(pod_data_list))
+
     def handle_pod_event(self, event_type: str, pod):
         """Podイベントの処理"""
-        pod_name = pod.metadata.name
-        namespace = pod.metadata.namespace
+        metadata = pod.metadata
+        pod_name = metadata.name
+        namespace = metadata.namespace
+        pod_uid = metadata.uid
+
+        # 監視対象外のnamespaceのPodは何も処理せずに終了
+        if self.target_namespaces and namespace not in self.target_namespaces:
+            return
+
+        status = pod.status
+        # statusがあってもphaseが未設定の場合がある（sys.internにNoneを渡さないように）
+        current_phase = (status.phase if status else None) or "Unknown"
+
+        # phaseが変化していないイベントは何も処理せずに終了
+        if not self._should_notify_phase_change(event_type, pod_uid, current_phase):
+            return
 
         # イベント処理の判定
         if not self.should_process_event(event_type, pod):
             return
 
-        self.logger.info(f"Pod event detected: {event_type} - {namespace}/{pod_name}")
+        self.logger.info("Pod event detected: %s - %s/%s", event_type, namespace, pod_name)
 
-        # 監視対象のnamespaceかチェック
-        target_namespaces = self.config.get('watcher', {}).get('namespaces', [])
-        if target_namespaces and namespace not in target_namespaces:
-            self.logger.debug(f"Skipping pod {namespace}/{pod_name} - not in target namespaces")
-            return
+        self._update_phase_history(event_type, pod_uid, current_phase)
 
         # Podデータを抽出
         pod_data = self._extract_pod_data(pod)
         pod_data['event_type'] = event_type
 
-        # clusterapiのDB更新エンドポイントを呼び出し
-        # success = self.clusterapi_client.update_pod_status(pod_data)
-
-        # if success:
-        #     self.logger.info(f"Successfully notified clusterapi about {event_type} event for {namespace}/{pod_name}")
-        # else:
-        #     self.logger.error(f"Failed to notify clusterapi about {event_type} event for {namespace}/{pod_name}")
+        # clusterapiのDB更新エンドポイントを呼び出し（バッチ送信キューに追加し、watchループはブロックしない）
+        if self.clusterapi_client:
+            self.clusterapi_client.enqueue_pod_status(pod_data)
+
+    def _build_watch_kwargs(self) -> Dict[str, Any]:
+        """watch呼び出しの引数を構築（サーバー側でフィルタリング）"""
+        watcher_config = self.config.get('watcher', {})
+        kwargs = {}
+
+        label_selector = watcher_config.get('label_selector')
+        if label_selector:
+            kwargs['label_selector'] = label_selector
+
+        field_selector = watcher_config.get('field_selector')
+        if field_selector:
+            kwargs['field_selector'] = field_selector
+
+        # 監視対象が1つのnamespaceのみの場合は、そのnamespaceのPodだけをwatch
+        if len(self.target_namespaces) == 1:
+            kwargs['namespace'] = next(iter(self.target_namespaces))
+
+        # WatchList: 初期一覧を1件ずつイベントとして受信（巨大なLIST応答を作らない）
+        if watcher_config.get('watch_list', False):
+            kwargs['send_initial_events'] = True
+            kwargs['allow_watch_bookmarks'] = True
+            kwargs['resource_version_match'] = 'NotOlderThan'
+
+        return kwargs
+
+    def _pod_list_func(self, watch_kwargs: Dict[str, Any]):
+        """watch・一覧取得に使用するAPI関数（namespace指定の有無で切り替え）"""
+        if 'namespace' in watch_kwargs:
+            return self.v1.list_namespaced_pod
+        return self.v1.list_pod_for_all_namespaces
+
+    def _prime_phase_history(self, watch_kwargs: Dict[str, Any]) -> str:
+        """現在のPod一覧からphase履歴を初期化し、一覧のresourceVersionを返す"""
+        list_kwargs = {k: v for k, v in watch_kwargs.items() if k in ('namespace', 'label_selector', 'field_selector')}
+        if not self.phase_change_only:
+            # 履歴を使用しない場合は一覧のresourceVersionのみ必要なため、1件だけ取得
+            list_kwargs['limit'] = 1
+        pods = self._pod_list_func(watch_kwargs)(**list_kwargs)
+
+        # phase履歴を使用しない場合は、一覧のresourceVersionのみ使用
+        if self.phase_change_only:
+            # Podごとに_update_phase_historyを呼ばず、一覧から履歴をまとめて構築
+            target_namespaces = self.target_namespaces
+            existing = {
+                pod.metadata.uid: sys.intern((pod.status.phase if pod.status else None) or "Unknown")
+                for pod in pods.items
+                if not target_namespaces or pod.metadata.namespace in target_namespaces
+            }
+            with self._history_lock:
+                self.pod_phase_history.update(existing)
+                while len(self.pod_phase_history) > self.max_phase_history:
+                    self.pod_phase_history.popitem(last=False)
+            self.logger.info("Primed phase history with %d existing pods", len(existing))
+
+        return pods.metadata.resource_version
+
+    def _load_resource_version(self, rv_file: str) -> Optional[str]:
+        """保存済みのresourceVersionを読み込み（存在しない場合はNone）"""
+        try:
+            with open(rv_file, 'r') as file:
+                return file.read().strip() or None
+        except OSError:
+            return None
+
+    def _save_resource_version(self, rv_file: str, resource_version: str):
+        """resourceVersionを保存（書き込み途中で停止しても壊れないよう一時ファイルから置き換え）"""
+        tmp_file = f"{rv_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, 'w') as file:
+                file.write(resource_version)
+            os.replace(tmp_file, rv_file)
+        except OSError as e:
+            self.logger.warning("Could not save resource version to %s: %s", rv_file, e)
+
+    def _build_resume_kwargs(self, watch_kwargs: Dict[str, Any], resource_version: Optional[str]) -> Dict[str, Any]:
+        """watch再接続用の引数を構築"""
+        kwargs = dict(watch_kwargs)
+        # BOOKMARKでresourceVersionを更新し続け、再接続時の全件再取得を避ける
+        kwargs['allow_watch_bookmarks'] = True
+        # Watch.streamの自動再接続は元の引数（WatchListの初期イベント要求を含む）で再送するため、
+        # サーバー側のタイムアウトで一旦終了させ、再接続はstart_watchingのループで行う
+        kwargs['timeout_seconds'] = self.config.get('watcher', {}).get('watch_timeout_seconds', 300)
+        if resource_version:
+            kwargs['resource_version'] = resource_version
+            # 再開時は初期イベントを再送させない
+            kwargs.pop('send_initial_events', None)
+            kwargs.pop('resource_version_match', None)
+        return kwargs
 
     def start_watching(self):
         """Pod監視を開始"""
@@ -247,31 +593,120 @@ class PodWatcher:
             return
 
         # clusterapiの疎通確認
-        # if not self.clusterapi_client.health_check():
-        #     self.logger.warning("ClusterAPI health check failed, but continuing...")
-        # else:
-        #     self.logger.info("ClusterAPI health check passed")
-
-        self.logger.info(f"Starting Pod watcher in {self.environment} environment...")
-        target_namespaces = self.config.get('watcher', {}).get('namespaces', [])
-        if target_namespaces:
-            self.logger.info(f"Monitoring namespaces: {target_namespaces}")
+        if self.clusterapi_client:
+            if not self.clusterapi_client.health_check():
+                self.logger.warning("ClusterAPI health check failed, but continuing...")
+            else:
+                self.logger.info("ClusterAPI health check passed")
+
+        self.logger.info("Starting Pod watcher in %s environment...", self.environment)
+        if self.target_namespaces:
+            self.logger.info("Monitoring namespaces: %s", sorted(self.target_namespaces))
         else:
             self.logger.info("Monitoring all namespaces")
+        watch_kwargs = self._build_watch_kwargs()
+        if watch_kwargs:
+            self.logger.info("Using server-side selectors: %s", watch_kwargs)
+
+        retry_config = self.config.get('watcher', {}).get('retry', {})
+        retry_delay = retry_config.get('delay_seconds', 5)
+        max_retry_delay = retry_config.get('max_delay_seconds', 60)
+        backoff = retry_delay
+        resource_version = None
+        list_func = self._pod_list_func(watch_kwargs)
+        handle_pod_event = self.handle_pod_event
+        rv_file = self.config.get('watcher', {}).get('resource_version_file')
+        prime_existing = not self.config.get('watcher', {}).get('notify_existing_pods', True)
+
+        # 前回保存したresourceVersionがあればそこから再開
+        if rv_file:
+            resource_version = self._load_resource_version(rv_file)
+            if resource_version:
+                self.logger.info("Resuming watch from saved resource version %s", resource_version)
 
         try:
-            # Podの監視を開始
-            stream = self.watch.stream(self.v1.list_pod_for_all_namespaces)
-
-            for event in stream:
-                event_type = event['type']
-                pod = event['object']
-                self.handle_pod_event(event_type, pod)
+            while not self._stop_event.is_set():
+                try:
+                    # 既存Podを通知しない場合は、一覧で履歴を初期化してその時点からwatchを開始
+                    # （410で再開する場合も、resourceVersionなしのwatchが既存Podを再通知しないよう一覧から取り直す）
+                    if not resource_version and prime_existing:
+                        resource_version = self._prime_phase_history(watch_kwargs)
+
+                    # Podの監視を開始（再接続時は最後に受信したresourceVersionから再開）
+                    stream = self.watch.stream(
+                        list_func,
+                        **self._build_resume_kwargs(watch_kwargs, resource_version)
+                    )
+
+                    for event in stream:
+                        event_type = event['type']
+                        # BOOKMARKはresourceVersionの通知のみでPodの変化ではない
+                        if event_type == 'BOOKMARK':
+                            # Watch側はBOOKMARKのresourceVersionを反映しないため、再接続位置を自前で更新
+                            bookmark_rv = event['raw_object']['metadata']['resourceVersion']
+                            self.watch.resource_version = bookmark_rv
+                            # BOOKMARKは定期的に届くため、このタイミングでBOOKMARK自身のresourceVersionを保存
+                            if rv_file:
+                                self._save_resource_version(rv_file, bookmark_rv)
+                            continue
+                        handle_pod_event(event_type, event['object'])
+
+                    # stop()が呼ばれた場合は終了
+                    if self._stop_event.is_set():
+                        break
+
+                    # APIサーバーがwatchを閉じた場合、イベント・BOOKMARKを受信していれば直ちに再接続
+                    if self.watch.resource_version != resource_version:
+                        resource_version = self.watch.resource_version
+                        backoff = retry_delay
+                        self.logger.debug("Watch stream closed by server, reconnecting from resource version %s", resource_version)
+                        continue
+                    # 何も受信せずに閉じられた場合は、再接続を繰り返さないようエラーと同様に待機
+                    error = "stream closed by server without new events"
+
+                except ApiException as e:
+                    if e.status == 410:
+                        # resourceVersionが古すぎる場合は最新の状態から再開
+                        self.logger.warning("Resource version expired (410 Gone), restarting watch from the current state")
+                        resource_version = None
+                        self.watch.resource_version = None
+                        continue
+                    # APIサーバーの一時的なエラー（再起動中・過負荷）以外は再接続しない
+                    if e.status != 429 and e.status < 500:
+                        raise
+                    error = e
+
+                except HTTPError as e:
+                    # 接続拒否（MaxRetryError）・切断（ProtocolError）・読み取りタイムアウトなど
+                    error = e
+
+                # 前回の切断以降にイベントを受信していれば、待ち時間を初期値に戻す
+                if self.watch.resource_version != resource_version:
+                    backoff = retry_delay
+                resource_version = self.watch.resource_version
+
+                # 指数バックオフ（複数のwatcherが同時に再接続しないようジッターを加える）
+                delay = backoff + random.uniform(0, backoff * 0.1)
+                self.logger.warning("Watch connection lost: %s. Reconnecting from resource version %s in %.1fs...", error, resource_version, delay)
+                if self._stop_event.wait(delay):
+                    break
+                backoff = min(backoff * 2, max_retry_delay)
 
         except KeyboardInterrupt:
             self.logger.info("Stopping Pod watcher...")
+            self._stop_event.set()
         except Exception as e:
-            self.logger.error(f"Error in Pod watcher: {e}")
+            self.logger.error("Error in Pod watcher: %s", e)
             raise
         finally:
             self.watch.stop()
+            if rv_file and self.watch.resource_version:
+                self._save_resource_version(rv_file, self.watch.resource_version)
+            # 保留中の通知を送信してから終了
+            if self.clusterapi_client:
+                self.clusterapi_client.close()
+
+    def stop(self):
+        """Pod監視を停止（次のイベント受信時、または再接続待ちの間に終了）"""
+        self._stop_event.set()
+        self.watch.stop()